@@ -18,6 +18,7 @@ try:
     from .triton_ops import (
         adaptive_layer_norm,
         fused_adaLN_scale_residual,
+        fused_group_norm_modulate,
         fused_rotary_emb,
         paddle_use_triton,
         rms_norm,
@@ -38,6 +39,7 @@ try:
         "weight_only_int8",
         "adaptive_layer_norm",
         "fused_adaLN_scale_residual",
+        "fused_group_norm_modulate",
         "rms_norm",
         "get_dtype_str",
         "fused_rotary_emb",
@@ -14,14 +14,90 @@
 # limitations under the License.
 
 import os
-from typing import Dict, Optional, Tuple
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
 
 import paddle
 import paddle.nn as nn
+import paddle.nn.functional as F
 
 from .activations import get_activation
 from .embeddings import CombinedTimestepLabelEmbeddings, CombinedTimestepSizeEmbeddings
 
+# shared, immutable LayerNorm/GroupNorm kwargs for the no-affine norms below; built once
+# instead of a fresh dict per layer during model construction.
+_NORM_NO_AFFINE = MappingProxyType({"weight_attr": False, "bias_attr": False})
+
+# read once at import: the flag is static for a process, and a module-level constant lets the
+# per-forward branch specialize instead of paying an env lookup every call.
+_USE_INFERENCE_OPTIMIZE_TRITON = bool(os.getenv("INFERENCE_OPTIMIZE_TRITON"))
+
+
+def _fused_layer_norm(x, weight, bias, epsilon):
+    # single-kernel LayerNorm; `paddle.incubate.nn.functional.fused_layer_norm` may
+    # return (out, mean, variance) depending on the Paddle version.
+    out = paddle.incubate.nn.functional.fused_layer_norm(
+        x,
+        norm_weight=weight,
+        norm_bias=bias,
+        epsilon=epsilon,
+        begin_norm_axis=x.ndim - 1,
+    )
+    return out[0] if isinstance(out, (tuple, list)) else out
+
+
+def _layer_norm(norm: nn.LayerNorm, x: paddle.Tensor) -> paddle.Tensor:
+    # fused_layer_norm is inference-only (it does not propagate gradients) and has no CPU
+    # kernel, so only take it for GPU inference; training and CPU keep the nn.LayerNorm call.
+    if not norm.training and x.place.is_gpu_place():
+        return _fused_layer_norm(x, norm.weight, norm.bias, norm._epsilon)
+    return norm(x)
+
+
+class _WeightOnlyInt8Linear(nn.Layer):
+    r"""
+    Weight-only INT8 replacement for an AdaLN modulation `nn.Linear` (inference only).
+
+    The weight is stored as int8 (biased to uint8 for the Triton kernel) with a per-output-channel
+    scale; activations stay in the model dtype. Built via `from_linear`.
+    """
+
+    def __init__(self, qweight: paddle.Tensor, scales: paddle.Tensor, bias: Optional[paddle.Tensor] = None):
+        super().__init__()
+        self.register_buffer("qweight", qweight)
+        self.register_buffer("scales", scales)
+        self.bias = bias
+
+    @classmethod
+    def from_linear(cls, linear: nn.Linear) -> "_WeightOnlyInt8Linear":
+        weight = linear.weight
+        scales = paddle.max(paddle.abs(weight), axis=0) / 127.0
+        # an all-zero output channel gives a zero scale; substitute 1 so the division below
+        # stays finite (the quantized column is all zeros either way).
+        scales = paddle.where(scales == 0, paddle.ones_like(scales), scales)
+        qweight = paddle.clip(paddle.round(weight / scales), min=-127, max=127)
+        # the Triton kernel expects the int8 weight biased into uint8.
+        qweight = (qweight.astype("int32") + 128).astype("uint8")
+        return cls(qweight, scales.cast(weight.dtype), linear.bias)
+
+    def forward(self, x: paddle.Tensor) -> paddle.Tensor:
+        if _USE_INFERENCE_OPTIMIZE_TRITON and x.dtype == paddle.float16:
+            # NOTE:(changwenbin,zhoukangkang)
+            # This is a fused faster op using Triton, only used in inference, not used in training.
+            # The weight_only_int8 kernel accumulates in fp16, so other activation dtypes take
+            # the dequantize + matmul fallback below.
+            import paddlemix
+
+            out_shape = x.shape[:-1] + [self.scales.shape[0]]
+            x = x.reshape([-1, x.shape[-1]])
+            out = paddlemix.triton_ops.weight_only_int8(x, self.qweight, self.scales, self.bias, bool_trans_w=False)
+            return out.reshape(out_shape)
+        weight = (self.qweight.astype(x.dtype) - 128.0) * self.scales
+        out = paddle.matmul(x, weight)
+        if self.bias is not None:
+            out = out + self.bias
+        return out
+
 
 class AdaLayerNorm(nn.Layer):
     r"""
@@ -35,15 +111,54 @@ class AdaLayerNorm(nn.Layer):
     def __init__(self, embedding_dim: int, num_embeddings: int):
         super().__init__()
         self.emb = nn.Embedding(num_embeddings, embedding_dim)
-        self.silu = nn.Silu()
         self.linear = nn.Linear(embedding_dim, embedding_dim * 2)
-        norm_elementwise_affine_kwargs = dict(weight_attr=False, bias_attr=False)
-        self.norm = nn.LayerNorm(embedding_dim, **norm_elementwise_affine_kwargs)
+        self.norm = nn.LayerNorm(embedding_dim, **_NORM_NO_AFFINE)
+        self._lut = None
+
+    def quantize_(self):
+        r"""Replace the modulation projection with a weight-only INT8 linear (inference only)."""
+        self.linear = _WeightOnlyInt8Linear.from_linear(self.linear)
+
+    def fuse_for_inference(self):
+        r"""
+        Precompute the modulation table for every timestep index (inference only).
+
+        `linear(silu(emb(timestep)))` depends only on the integer timestep, so a
+        `[num_embeddings, 2 * embedding_dim]` table computed once after loading turns the whole
+        SiLU + GEMM projection in `forward` into a single gather.
+        """
+        with paddle.no_grad():
+            self._lut = self.linear(F.silu(self.emb.weight))
 
     def forward(self, x: paddle.Tensor, timestep: paddle.Tensor) -> paddle.Tensor:
-        emb = self.linear(self.silu(self.emb(timestep)))
-        scale, shift = paddle.chunk(emb, 2)
-        x = self.norm(x) * (1 + scale) + shift
+        if self._lut is not None:
+            # index_select materializes a copy; plain indexing would return a view of the
+            # table, and the epilogue below must not write back into it.
+            emb = paddle.index_select(self._lut, timestep.reshape([-1]), axis=0)
+            if timestep.ndim == 0:
+                emb = emb.squeeze(0)
+        else:
+            emb = self.linear(F.silu(self.emb(timestep)))
+        half = emb.shape[0] // 2
+        scale, shift = emb[:half], emb[half:]
+        if _USE_INFERENCE_OPTIMIZE_TRITON and x.ndim == 3 and scale.ndim == 1:
+            # NOTE:(changwenbin,zhoukangkang)
+            # This is a fused faster op using Triton, only used in inference, not used in training.
+            # The axis-0 chunk above yields 1-D scale/shift; the kernel expects [B, D], so tile
+            # the row per batch. The tile cost is negligible next to the fused norm + modulate.
+            import paddlemix
+
+            x = paddlemix.triton_ops.adaptive_layer_norm(
+                x,
+                paddle.tile(scale.unsqueeze(0), [x.shape[0], 1]),
+                paddle.tile(shift.unsqueeze(0), [x.shape[0], 1]),
+                epsilon=self.norm._epsilon,
+            )
+        else:
+            # out of place: `scale` is a slice view of `emb`, so an in-place add would
+            # write back into the projection output.
+            scale = scale + 1
+            x = _layer_norm(self.norm, x) * scale + shift
         return x
 
 
@@ -64,10 +179,67 @@ class AdaLayerNormZero(nn.Layer):
         else:
             self.emb = None
 
-        self.silu = nn.Silu()
         self.linear = nn.Linear(embedding_dim, 6 * embedding_dim)
-        norm_elementwise_affine_kwargs = dict(weight_attr=False, bias_attr=False)
-        self.norm = nn.LayerNorm(embedding_dim, epsilon=1e-6, **norm_elementwise_affine_kwargs)
+        self.norm = nn.LayerNorm(embedding_dim, epsilon=1e-6, **_NORM_NO_AFFINE)
+        self._unit_scale_folded = False
+
+    def fold_unit_scale_into_bias_(self):
+        r"""
+        Fold the constant `1` of the `(1 + scale_msa)` modulation into the scale_msa slice of
+        `self.linear.bias`, so `forward` multiplies by the projected scale directly.
+
+        Call this once after the weights are loaded; inference only. The Triton fused path
+        already folds the add in-kernel, so this targets the eager path and `forward` skips
+        the Triton branch once folded.
+        """
+        if self.linear.bias is None:
+            raise ValueError("fold_unit_scale_into_bias_ requires `self.linear` to have a bias.")
+        dim = self.linear.bias.shape[0] // 6
+        with paddle.no_grad():
+            self.linear.bias[dim : 2 * dim] += 1.0
+        self._unit_scale_folded = True
+
+    def quantize_(self):
+        r"""Replace the modulation projection with a weight-only INT8 linear (inference only)."""
+        self.linear = _WeightOnlyInt8Linear.from_linear(self.linear)
+
+    def project_emb(self, emb: paddle.Tensor) -> paddle.Tensor:
+        r"""
+        Apply the SiLU + Linear modulation projection to a conditioning embedding.
+
+        Blocks that share one conditioning embedding across several AdaLN layers can call this once
+        per step and pass the result to `forward` with `emb_is_projected=True`, saving one GEMM per layer.
+        """
+        return self.linear(F.silu(emb))
+
+    @classmethod
+    def pack(cls, layers: List["AdaLayerNormZero"]) -> "AdaLayerNormZeroPackedProj":
+        r"""
+        Pack the modulation projections of several `AdaLayerNormZero` layers into one GEMM.
+
+        The caller runs the packed projection once per step on the shared conditioning embedding
+        and passes each returned slice to the matching layer's `forward` with
+        `emb_is_projected=True`, replacing N small `[B, D] x [D, 6D]` GEMMs with a single
+        `[B, D] x [D, 6*D*N]` one.
+        """
+        if len(layers) == 0:
+            raise ValueError("`layers` must contain at least one AdaLayerNormZero.")
+        weight = paddle.concat([layer.linear.weight for layer in layers], axis=1)
+        bias = paddle.concat([layer.linear.bias for layer in layers], axis=0)
+        return AdaLayerNormZeroPackedProj(weight, bias, len(layers))
+
+    def forward_with_emb(
+        self, x: paddle.Tensor, emb: paddle.Tensor
+    ) -> Tuple[paddle.Tensor, paddle.Tensor, paddle.Tensor, paddle.Tensor, paddle.Tensor]:
+        r"""
+        Branch-free variant of `forward` taking the shared (un-projected) conditioning embedding.
+
+        There is no optional timestep/class-label embedding or `emb_is_projected` dispatch here,
+        so the traced graph is unconditional; wrapping this method with `paddle.jit.to_static`
+        (with `build_strategy.build_cinn_pass = True`) or `paddle.incubate.jit.inference` lets
+        the compiler fuse the SiLU + Linear projection with its chunk and modulation consumers.
+        """
+        return self._modulate(x, self.project_emb(emb))
 
     def forward(
         self,
@@ -76,16 +248,68 @@ class AdaLayerNormZero(nn.Layer):
         class_labels: Optional[paddle.Tensor] = None,
         hidden_dtype: Optional[paddle.dtype] = None,
         emb: Optional[paddle.Tensor] = None,
+        emb_is_projected: bool = False,
     ) -> Tuple[paddle.Tensor, paddle.Tensor, paddle.Tensor, paddle.Tensor, paddle.Tensor]:
-        # emb = self.linear(self.silu(self.emb(timestep, class_labels, hidden_dtype=hidden_dtype)))
+        # emb = self.linear(F.silu(self.emb(timestep, class_labels, hidden_dtype=hidden_dtype)))
         if self.emb is not None:
             emb = self.emb(timestep, class_labels, hidden_dtype=hidden_dtype)
-        emb = self.linear(self.silu(emb))
-        shift_msa, scale_msa, gate_msa, shift_mlp, scale_mlp, gate_mlp = emb.chunk(6, axis=1)
-        x = self.norm(x) * (1 + scale_msa[:, None]) + shift_msa[:, None]
+        if not emb_is_projected:
+            emb = self.project_emb(emb)
+        return self._modulate(x, emb)
+
+    def _modulate(
+        self, x: paddle.Tensor, emb: paddle.Tensor
+    ) -> Tuple[paddle.Tensor, paddle.Tensor, paddle.Tensor, paddle.Tensor, paddle.Tensor]:
+        dim = emb.shape[1] // 6
+        shift_msa = emb[:, 0:dim]
+        scale_msa = emb[:, dim : 2 * dim]
+        gate_msa = emb[:, 2 * dim : 3 * dim]
+        shift_mlp = emb[:, 3 * dim : 4 * dim]
+        scale_mlp = emb[:, 4 * dim : 5 * dim]
+        gate_mlp = emb[:, 5 * dim :]
+        if _USE_INFERENCE_OPTIMIZE_TRITON and not self._unit_scale_folded:
+            # NOTE:(changwenbin,zhoukangkang)
+            # This is a fused faster op using Triton, only used in inference, not used in training.
+            import paddlemix
+
+            x = paddlemix.triton_ops.adaptive_layer_norm(x, scale_msa, shift_msa, epsilon=self.norm._epsilon)
+        elif self._unit_scale_folded:
+            x = _layer_norm(self.norm, x) * scale_msa.unsqueeze(1) + shift_msa.unsqueeze(1)
+        else:
+            scale_msa = scale_msa + 1
+            x = _layer_norm(self.norm, x) * scale_msa.unsqueeze(1) + shift_msa.unsqueeze(1)
         return x, gate_msa, shift_mlp, scale_mlp, gate_mlp
 
 
+class AdaLayerNormZeroPackedProj(nn.Layer):
+    r"""
+    Packed SiLU + Linear modulation projection for a stack of `AdaLayerNormZero` layers.
+
+    Built via `AdaLayerNormZero.pack`; holds the concatenated `[D, 6*D*N]` projection weight of N
+    layers so the modulation vectors of every block come out of one kernel launch.
+    """
+
+    def __init__(self, weight: paddle.Tensor, bias: paddle.Tensor, num_layers: int):
+        super().__init__()
+        self.num_layers = num_layers
+        self.weight = self.create_parameter(
+            shape=weight.shape,
+            dtype=weight.dtype,
+            default_initializer=nn.initializer.Assign(weight),
+        )
+        self.bias = self.create_parameter(
+            shape=bias.shape,
+            dtype=bias.dtype,
+            is_bias=True,
+            default_initializer=nn.initializer.Assign(bias),
+        )
+
+    def forward(self, emb: paddle.Tensor) -> List[paddle.Tensor]:
+        emb = paddle.matmul(F.silu(emb), self.weight) + self.bias
+        width = emb.shape[1] // self.num_layers
+        return [emb[:, i * width : (i + 1) * width] for i in range(self.num_layers)]
+
+
 class AdaLayerNormSingle(nn.Layer):
     r"""
     Norm layer adaptive layer norm single (adaLN-single).
@@ -104,7 +328,6 @@ class AdaLayerNormSingle(nn.Layer):
             embedding_dim, size_emb_dim=embedding_dim // 3, use_additional_conditions=use_additional_conditions
         )
 
-        self.silu = nn.Silu()
         self.linear = nn.Linear(embedding_dim, 6 * embedding_dim)
 
     def forward(
@@ -116,7 +339,7 @@ class AdaLayerNormSingle(nn.Layer):
     ) -> Tuple[paddle.Tensor, paddle.Tensor, paddle.Tensor, paddle.Tensor, paddle.Tensor]:
         # No modulation happening here.
         embedded_timestep = self.emb(timestep, **added_cond_kwargs, batch_size=batch_size, hidden_dtype=hidden_dtype)
-        return self.linear(self.silu(embedded_timestep)), embedded_timestep
+        return self.linear(F.silu(embedded_timestep)), embedded_timestep
 
 
 class AdaGroupNorm(nn.Layer):
@@ -129,14 +352,27 @@ class AdaGroupNorm(nn.Layer):
         num_groups (`int`): The number of groups to separate the channels into.
         act_fn (`str`, *optional*, defaults to `None`): The activation function to use.
         eps (`float`, *optional*, defaults to `1e-5`): The epsilon value to use for numerical stability.
+        data_format (`str`, *optional*, defaults to `"NCHW"`): The layout of the 4-D input, `"NCHW"` or
+            `"NHWC"`. With channels last the scale/shift broadcast runs along the contiguous innermost
+            axis, which is noticeably faster for bf16 inference; callers should convert the activations
+            once at the entry of the decoder.
     """
 
     def __init__(
-        self, embedding_dim: int, out_dim: int, num_groups: int, act_fn: Optional[str] = None, eps: float = 1e-5
+        self,
+        embedding_dim: int,
+        out_dim: int,
+        num_groups: int,
+        act_fn: Optional[str] = None,
+        eps: float = 1e-5,
+        data_format: str = "NCHW",
     ):
         super().__init__()
         self.num_groups = num_groups
         self.eps = eps
+        if data_format not in ("NCHW", "NHWC"):
+            raise ValueError(f"unknown data_format {data_format}")
+        self.data_format = data_format
 
         if act_fn is None:
             self.act = None
@@ -145,8 +381,9 @@ class AdaGroupNorm(nn.Layer):
 
         self.linear = nn.Linear(embedding_dim, out_dim * 2)
 
-        norm_elementwise_affine_kwargs = dict(weight_attr=False, bias_attr=False)
-        self.group_norm = nn.GroupNorm(num_groups, out_dim, epsilon=eps, **norm_elementwise_affine_kwargs)
+        self.group_norm = nn.GroupNorm(num_groups, out_dim, epsilon=eps, data_format=data_format, **_NORM_NO_AFFINE)
+        # weight_attr=False still creates the affine Parameters; drop them so they do not
+        # show up in the state dict (checkpoint-key compatibility).
         self.group_norm.weight = None
         self.group_norm.bias = None
 
@@ -154,11 +391,28 @@ class AdaGroupNorm(nn.Layer):
         if self.act:
             emb = self.act(emb)
         emb = self.linear(emb)
-        emb = emb[:, :, None, None]
-        scale, shift = emb.chunk(2, axis=1)
+        if _USE_INFERENCE_OPTIMIZE_TRITON and self.data_format == "NCHW":
+            # NOTE:(changwenbin,zhoukangkang)
+            # This is a fused faster op using Triton, only used in inference, not used in training.
+            import paddlemix
+
+            half = emb.shape[1] // 2
+            scale, shift = emb[:, :half], emb[:, half:]
+            return paddlemix.triton_ops.fused_group_norm_modulate(x, scale, shift, self.num_groups, epsilon=self.eps)
+        # split on the 2-D projection first, then reshape for the layout; both slices stay
+        # contiguous, so the broadcast below uses cheap per-channel loads. For NHWC the
+        # [B, 1, 1, C] scale/shift broadcast along the contiguous innermost axis.
+        half = emb.shape[1] // 2
+        if self.data_format == "NCHW":
+            scale = emb[:, :half].reshape([emb.shape[0], -1, 1, 1])
+            shift = emb[:, half:].reshape([emb.shape[0], -1, 1, 1])
+        else:
+            scale = emb[:, :half].reshape([emb.shape[0], 1, 1, -1])
+            shift = emb[:, half:].reshape([emb.shape[0], 1, 1, -1])
 
         x = self.group_norm(x)
-        x = x * (1 + scale) + shift
+        scale = scale + 1
+        x = x * scale + shift
         return x
 
 
@@ -178,7 +432,6 @@ class AdaLayerNormContinuous(nn.Layer):
         norm_type="layer_norm",
     ):
         super().__init__()
-        self.silu = nn.Silu()
         self.linear = nn.Linear(conditioning_embedding_dim, embedding_dim * 2, bias_attr=bias)
         if norm_type == "layer_norm":
             self.norm = nn.LayerNorm(embedding_dim, eps, weight_attr=elementwise_affine, bias_attr=bias)
@@ -186,19 +439,50 @@ class AdaLayerNormContinuous(nn.Layer):
             self.norm = RMSNorm(embedding_dim, eps, elementwise_affine)
         else:
             raise ValueError(f"unknown norm_type {norm_type}")
+        self._unit_scale_folded = False
+
+    def fold_unit_scale_into_bias_(self):
+        r"""
+        Fold the constant `1` of the `(1 + scale)` modulation into the scale slice of
+        `self.linear.bias`, so `forward` multiplies by the projected scale directly.
+
+        Call this once after the weights are loaded; inference only. The Triton fused path
+        already folds the add in-kernel, so this targets the eager path and `forward` skips
+        the Triton branch once folded.
+        """
+        if self.linear.bias is None:
+            raise ValueError("fold_unit_scale_into_bias_ requires `self.linear` to have a bias.")
+        half = self.linear.bias.shape[0] // 2
+        with paddle.no_grad():
+            self.linear.bias[:half] += 1.0
+        self._unit_scale_folded = True
+
+    def quantize_(self):
+        r"""Replace the modulation projection with a weight-only INT8 linear (inference only)."""
+        self.linear = _WeightOnlyInt8Linear.from_linear(self.linear)
+
+    def _norm_x(self, x: paddle.Tensor) -> paddle.Tensor:
+        if isinstance(self.norm, nn.LayerNorm):
+            return _layer_norm(self.norm, x)
+        return self.norm(x)
 
     def forward(self, x: paddle.Tensor, conditioning_embedding: paddle.Tensor) -> paddle.Tensor:
         # convert back to the original dtype in case `conditioning_embedding`` is upcasted to float32 (needed for hunyuanDiT)
-        emb = self.linear(self.silu(conditioning_embedding).cast(x.dtype))
-        scale, shift = paddle.chunk(emb, 2, axis=1)
-        if os.getenv("INFERENCE_OPTIMIZE_TRITON"):
+        # cast before the silu so both the activation and the GEMM run in x.dtype (bf16/fp16 tensor cores)
+        emb = self.linear(F.silu(conditioning_embedding.cast(x.dtype)))
+        half = emb.shape[1] // 2
+        scale, shift = emb[:, :half], emb[:, half:]
+        if _USE_INFERENCE_OPTIMIZE_TRITON and not self._unit_scale_folded:
             # NOTE:(changwenbin,zhoukangkang)
             # This is a fused faster op using Triton, only used in inference, not used in training.
             import paddlemix
 
             x = paddlemix.triton_ops.adaptive_layer_norm(x, scale, shift, self.norm.weight, self.norm.bias)
+        elif self._unit_scale_folded:
+            x = self._norm_x(x) * scale.unsqueeze(1) + shift.unsqueeze(1)
         else:
-            x = self.norm(x) * (1 + scale)[:, None, :] + shift[:, None, :]
+            scale = scale + 1
+            x = self._norm_x(x) * scale.unsqueeze(1) + shift.unsqueeze(1)
         return x
 
 
@@ -217,10 +501,11 @@ class RMSNorm(nn.Layer):
             self.weight = None
 
     def forward(self, hidden_states):
-        paddle.incubate.nn.functional.fused_rms_norm(
+        out = paddle.incubate.nn.functional.fused_rms_norm(
             x=hidden_states,
             norm_weight=self.weight,
             norm_bias=None,
             epsilon=self.epsilon,
-            begin_norm_axis=2,
+            begin_norm_axis=hidden_states.ndim - 1,
         )
+        return out[0] if isinstance(out, tuple) else out
@@ -14,13 +14,20 @@
 # limitations under the License.
 
 
+import copy
 import unittest
 
 import numpy as np
 import paddle
 from paddle import nn
 
-from ppdiffusers.models.attention import GEGLU, AdaLayerNorm, ApproximateGELU
+from ppdiffusers.models.attention import (
+    GEGLU,
+    AdaLayerNorm,
+    AdaLayerNormContinuous,
+    AdaLayerNormZero,
+    ApproximateGELU,
+)
 from ppdiffusers.models.embeddings import get_timestep_embedding
 from ppdiffusers.models.lora import LoRACompatibleLinear
 from ppdiffusers.models.resnet import Downsample2D, ResnetBlock2D, Upsample2D
@@ -728,3 +735,73 @@ class Transformer2DModelTests(unittest.TestCase):
         assert spatial_transformer_block.transformer_blocks[0].attn1.to_q.bias is not None
         assert spatial_transformer_block.transformer_blocks[0].attn1.to_k.bias is not None
         assert spatial_transformer_block.transformer_blocks[0].attn1.to_v.bias is not None
+
+
+class AdaLayerNormInferenceOptimTests(unittest.TestCase):
+    def test_ada_layer_norm_zero_packed_matches_per_layer(self):
+        paddle.seed(0)
+        dim = 32
+        layers = [AdaLayerNormZero(dim), AdaLayerNormZero(dim)]
+        for layer in layers:
+            layer.eval()
+        packed = AdaLayerNormZero.pack(layers)
+
+        emb = paddle.randn([2, dim])
+        slices = packed(emb)
+
+        assert len(slices) == len(layers)
+        for layer, projected in zip(layers, slices):
+            assert paddle.allclose(projected, layer.project_emb(emb), atol=1e-5)
+
+    def test_ada_layer_norm_zero_folded_matches_unfolded(self):
+        paddle.seed(0)
+        dim = 32
+        layer = AdaLayerNormZero(dim)
+        layer.eval()
+        folded = copy.deepcopy(layer)
+        folded.fold_unit_scale_into_bias_()
+
+        x = paddle.randn([2, 8, dim])
+        emb = paddle.randn([2, dim])
+        reference = layer.forward_with_emb(x, emb)
+        outputs = folded.forward_with_emb(x, emb)
+
+        # the modulated hidden states match; gate/mlp slices are untouched by the fold
+        assert paddle.allclose(outputs[0], reference[0], atol=1e-5)
+        for out, ref in zip(outputs[1:], reference[1:]):
+            assert paddle.allclose(out, ref, atol=1e-5)
+
+    def test_ada_layer_norm_continuous_quantized_matches_float(self):
+        paddle.seed(0)
+        dim = 32
+        layer = AdaLayerNormContinuous(dim, dim)
+        layer.eval()
+        quantized = copy.deepcopy(layer)
+        quantized.quantize_()
+
+        x = paddle.randn([2, 8, dim])
+        conditioning = paddle.randn([2, dim])
+        reference = layer(x, conditioning)
+        out = quantized(x, conditioning)
+
+        # int8 weight quantization is lossy, so the tolerance is looser here
+        assert paddle.allclose(out, reference, atol=5e-2)
+
+    def test_ada_layer_norm_lut_matches_eager(self):
+        paddle.seed(0)
+        dim = 32
+        num_embeddings = 8
+        layer = AdaLayerNorm(dim, num_embeddings)
+        layer.eval()
+
+        x = paddle.randn([2, 8, dim])
+        timestep = paddle.to_tensor(3)
+        reference = layer(x, timestep)
+
+        layer.fuse_for_inference()
+        table = layer._lut.clone()
+        out = layer(x, timestep)
+
+        assert paddle.allclose(out, reference, atol=1e-5)
+        # the lookup must not write back into the precomputed table
+        assert paddle.allclose(layer._lut, table, atol=0.0)